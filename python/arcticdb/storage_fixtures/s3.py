@@ -12,24 +12,32 @@ import json
 import os
 import re
 import sys
-import trustme
 import subprocess
 import platform
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from tempfile import mkdtemp
 
-
-import requests
-from typing import NamedTuple, Optional, Any, Type
+from typing import NamedTuple, Optional, Any, Type, Dict, Union
 
 from .api import *
-from .utils import get_ephemeral_port, GracefulProcessUtils, wait_for_server_to_come_up, safer_rmtree
+from .utils import (
+    get_ephemeral_port,
+    GracefulProcessUtils,
+    wait_for_server_to_come_up,
+    safer_rmtree,
+    handle_cleanup_exception,
+)
 from arcticc.pb2.storage_pb2 import EnvironmentConfigsMap
 from arcticdb.version_store.helper import add_s3_library_to_env
 
 # All storage client libraries to be imported on-demand to speed up start-up of ad-hoc test runs
 
 Key = NamedTuple("Key", [("id", str), ("secret", str), ("user_name", str)])
+_ENDPOINT_RE = re.compile(r"(?:http(?P<secure>s?)://)?(?P<host>[^:/]+)(?::(?P<port>\d+))?", re.ASCII)
 _PermissionCapableFactory: Type["MotoS3StorageFixtureFactory"] = None  # To be set later
+_LINUX = platform.system() == "Linux"
 
 logging.getLogger("botocore").setLevel(logging.INFO)
 
@@ -49,24 +57,27 @@ class S3Bucket(StorageFixture):
         super().__init__()
         self.factory = factory
         self.bucket = bucket
+        self._boto_bucket_lock = threading.Lock()
 
         if isinstance(factory, _PermissionCapableFactory) and factory.enforcing_permissions:
             self.key = factory._create_user_get_key(bucket + "_user")
         else:
             self.key = factory.default_key
 
-        secure, host, port = re.match(r"(?:http(s?)://)?([^:/]+)(?::(\d+))?", factory.endpoint).groups()
-        self.arctic_uri = f"s3{secure or ''}://{host}:{self.bucket}?access={self.key.id}&secret={self.key.secret}"
+        endpoint = _ENDPOINT_RE.match(factory.endpoint)
+        secure, host, port = endpoint["secure"], endpoint["host"], endpoint["port"]
+        parts = [f"s3{secure or ''}://{host}:{self.bucket}?access={self.key.id}&secret={self.key.secret}"]
         if port:
-            self.arctic_uri += f"&port={port}"
+            parts.append(f"&port={port}")
         if factory.default_prefix:
-            self.arctic_uri += f"&path_prefix={factory.default_prefix}"
+            parts.append(f"&path_prefix={factory.default_prefix}")
         if factory.ssl:
-            self.arctic_uri += "&ssl=True"
-        if platform.system() == "Linux":
+            parts.append("&ssl=True")
+        if _LINUX:
             if factory.client_cert_file:
-                self.arctic_uri += f"&CA_cert_path={self.factory.client_cert_file}"
+                parts.append(f"&CA_cert_path={self.factory.client_cert_file}")
             # client_cert_dir is skipped on purpose; It will be test manually in other tests
+        self.arctic_uri = "".join(parts)
 
     def __exit__(self, exc_type, exc_value, traceback):
         if self.factory.clean_bucket_on_fixture_exit:
@@ -74,11 +85,7 @@ class S3Bucket(StorageFixture):
 
     def create_test_cfg(self, lib_name: str) -> EnvironmentConfigsMap:
         cfg = EnvironmentConfigsMap()
-        if self.factory.default_prefix:
-            with_prefix = f"{self.factory.default_prefix}/{lib_name}"
-        else:
-            with_prefix = False
-
+        factory = self.factory
         add_s3_library_to_env(
             cfg,
             lib_name=lib_name,
@@ -86,14 +93,14 @@ class S3Bucket(StorageFixture):
             credential_name=self.key.id,
             credential_key=self.key.secret,
             bucket_name=self.bucket,
-            endpoint=self.factory.endpoint,
-            with_prefix=with_prefix,
-            is_https=self.factory.endpoint.startswith("s3s:"),
-            region=self.factory.region,
-            use_mock_storage_for_testing=self.factory.use_mock_storage_for_testing,
-            ssl=self.factory.ssl,
-            ca_cert_path=self.factory.client_cert_file,
-        )# client_cert_dir is skipped on purpose; It will be test manually in other tests
+            endpoint=factory.endpoint,
+            with_prefix=factory._with_prefix(lib_name),
+            is_https=factory.is_https,
+            region=factory.region,
+            use_mock_storage_for_testing=factory.use_mock_storage_for_testing,
+            ssl=factory.ssl,
+            ca_cert_path=factory.client_cert_file,
+        )  # client_cert_dir is skipped on purpose; It will be test manually in other tests
         return cfg
 
     def set_permission(self, *, read: bool, write: bool):
@@ -110,59 +117,147 @@ class S3Bucket(StorageFixture):
             factory._iam_admin.delete_user_policy(UserName=self.key.user_name, PolicyName="bucket")
 
     def get_boto_bucket(self):
-        """Lazy singleton. Not thread-safe."""
-        if not self._boto_bucket:
-            self._boto_bucket = self.factory._boto("s3", self.key, api="resource").Bucket(self.bucket)
+        """Lazy singleton. Thread-safe, but the returned resource itself is not."""
+        if self._boto_bucket is None:
+            with self._boto_bucket_lock:
+                if self._boto_bucket is None:
+                    self._boto_bucket = self.factory._boto("s3", self.key, api="resource").Bucket(self.bucket)
         return self._boto_bucket
 
     def iter_underlying_object_names(self):
-        return (obj.key for obj in self.get_boto_bucket().objects.all())
+        client = self.factory._boto("s3", self.key)
+        for page in client.get_paginator("list_objects_v2").paginate(Bucket=self.bucket):
+            for obj in page.get("Contents", ()):
+                yield obj["Key"]
+
+    def fast_cleanup(self, client=None, prefix: Optional[str] = None, failure_consequence=""):
+        """Deletes all objects (under the ``prefix`` directory if given) with one ``delete_objects`` call per page.
+
+        Unlike ``slow_cleanup()``, this bypasses ArcticDB, so it also removes objects not belonging to known libraries.
+        Only use it on buckets/prefixes this fixture owns."""
+        client = client or self.factory._boto("s3", self.key)
+        listing_args = {"Bucket": self.bucket}
+        if prefix:
+            prefix = prefix.rstrip("/")
+            listing_args["Prefix"] = prefix + "/"  # So "run1" doesn't also match "run10/..."
+        handler = handle_cleanup_exception(self, "objects", consequence=failure_consequence)
+        with handler:
+            for page in client.get_paginator("list_objects_v2").paginate(**listing_args):
+                objects = [{"Key": obj["Key"]} for obj in page.get("Contents", ())]
+                if objects:
+                    response = client.delete_objects(Bucket=self.bucket, Delete={"Objects": objects, "Quiet": True})
+                    errors = response.get("Errors")
+                    if errors:  # Quiet mode reports per-key failures here instead of raising
+                        raise RuntimeError(f"Failed to delete {len(errors)} objects, e.g. {errors[0]}")
+        if handler.had_exception:
+            return  # Keep tracking everything, so slow_cleanup() can still have a go
+
+        def _deleted(lib_name):
+            path = self.factory._with_prefix(lib_name) or lib_name
+            return not prefix or path == prefix or path.startswith(prefix + "/")
+
+        for name in [name for name in self.libs_from_factory if _deleted(name)]:
+            del self.libs_from_factory[name]
+        self.libs_names_from_arctic[:] = [name for name in self.libs_names_from_arctic if not _deleted(name)]
 
     def copy_underlying_objects_to(self, destination: "S3Bucket"):
-        source_client = self.factory._boto("s3", self.key)
-        dest = destination.get_boto_bucket()
-        for key in self.iter_underlying_object_names():
-            dest.copy({"Bucket": self.bucket, "Key": key}, key, SourceClient=source_client)
+        # Clients, unlike resources, are thread-safe, so the copies can share one across the pool.
+        # Fixture objects are far below the multipart threshold, so a plain CopyObject per key is enough.
+        dest_client = destination.factory._boto("s3", destination.key)
+
+        def _copy(key):
+            dest_client.copy_object(CopySource={"Bucket": self.bucket, "Key": key}, Bucket=destination.bucket, Key=key)
+
+        keys = list(self.iter_underlying_object_names())
+        with ThreadPoolExecutor(max_workers=BaseS3StorageFixtureFactory.MAX_POOL_CONNECTIONS) as executor:
+            list(executor.map(_copy, keys))
 
 
 class BaseS3StorageFixtureFactory(StorageFixtureFactory):
     """Logic and fields common to real and mock S3"""
 
-    endpoint: str
+    _endpoint: Optional[str] = None
+    is_https = False
+    """Derived from ``endpoint`` whenever that is set"""
     region: str
     default_key: Key
     default_bucket: Optional[str] = None
     default_prefix: Optional[str] = None
     clean_bucket_on_fixture_exit = True
+    use_fast_cleanup = False
+    """If set, ``cleanup_bucket()`` batch-deletes the objects directly rather than going through ArcticDB"""
     use_mock_storage_for_testing = None  # If set to true allows error simulation
+    MAX_POOL_CONNECTIONS = 50
+    """Connection pool size of the boto3 clients, which also bounds the concurrency of bulk operations"""
 
     def __init__(self):
         self.client_cert_file = ""
         self.client_cert_dir = ""
         self.ssl = False
-        
+        self._boto_session = None
+        self._boto_cache: Dict[tuple, Any] = {}
+        self._http_session = None
+
     def __str__(self):
         return f"{type(self).__name__}[{self.default_bucket or self.endpoint}]"
 
+    @property
+    def endpoint(self) -> Optional[str]:
+        return self._endpoint
+
+    @endpoint.setter
+    def endpoint(self, endpoint: Optional[str]):
+        self._endpoint = endpoint
+        self.is_https = bool(endpoint) and endpoint.startswith("https://")
+
+    def _with_prefix(self, lib_name: str):
+        """The ``with_prefix`` argument for ``add_s3_library_to_env()``"""
+        return f"{self.default_prefix}/{lib_name}" if self.default_prefix else False
+
     def _boto(self, service: str, key: Key, api="client"):
-        import boto3
-
-        ctor = getattr(boto3, api)
-        return ctor(
-            service_name=service,
-            endpoint_url=self.endpoint if service == "s3" else self._iam_endpoint,
-            region_name=self.region,
-            aws_access_key_id=key.id,
-            aws_secret_access_key=key.secret,
-            verify=self.client_cert_file if self.client_cert_file else False,
-        ) # verify=False cannot skip verification on buggy boto3 in py3.6
+        """Clients/resources are cached per factory, so they share one boto3 Session and its connection pools"""
+        endpoint_url = self.endpoint if service == "s3" else self._iam_endpoint
+        verify = self.client_cert_file if self.client_cert_file else False
+        cache_key = (service, key, api, endpoint_url, verify)
+        out = self._boto_cache.get(cache_key)
+        if out is None:
+            import boto3
+            from botocore.client import Config
+
+            if self._boto_session is None:
+                self._boto_session = boto3.session.Session()
+            ctor = getattr(self._boto_session, api)
+            out = self._boto_cache[cache_key] = ctor(
+                service_name=service,
+                endpoint_url=endpoint_url,
+                region_name=self.region,
+                aws_access_key_id=key.id,
+                aws_secret_access_key=key.secret,
+                verify=verify,
+                config=Config(max_pool_connections=self.MAX_POOL_CONNECTIONS),
+            )  # verify=False cannot skip verification on buggy boto3 in py3.6
+        return out
+
+    def _http(self):
+        """Lazily created ``requests.Session`` shared by all plain HTTP calls, so connections are kept alive"""
+        if self._http_session is None:
+            import requests
+
+            self._http_session = requests.Session()
+            self._http_session.verify = False  # If CA cert verify fails, it will take ages for the requests to finish
+        return self._http_session
 
     def create_fixture(self) -> S3Bucket:
         return S3Bucket(self, self.default_bucket)
 
     def cleanup_bucket(self, b: S3Bucket):
-        # When dealing with a potentially shared bucket, we only clear our the libs we know about:
-        b.slow_cleanup(failure_consequence="We will be charged unless we manually delete it. ")
+        consequence = "We will be charged unless we manually delete it. "
+        # Only safe when the prefix is not shared with anything else. Never batch-delete a whole real bucket.
+        if self.use_fast_cleanup and self.default_prefix:
+            b.fast_cleanup(prefix=self.default_prefix, failure_consequence=consequence)
+        else:
+            # When dealing with a potentially shared bucket, we only clear our the libs we know about:
+            b.slow_cleanup(failure_consequence=consequence)
 
 
 def real_s3_from_environment_variables(*, shared_path: bool):
@@ -196,92 +291,127 @@ def mock_s3_with_error_simulation():
     return out
 
 
+def _policy(*statements):
+    return json.dumps({"Version": "2012-10-17", "Statement": statements})
+
+
 class MotoS3StorageFixtureFactory(BaseS3StorageFixtureFactory):
     default_key = Key("awd", "awd", "dummy")
-    _RO_POLICY: str
-    _RW_POLICY: str
+    _ADMIN_POLICY = _policy(
+        {"Effect": "Allow", "Action": "s3:*", "Resource": "*"},
+        {"Effect": "Allow", "Action": "iam:*", "Resource": "*"},
+    )
+    _RO_POLICY = _policy({"Effect": "Allow", "Action": ["s3:List*", "s3:Get*"], "Resource": "*"})
+    _RW_POLICY = _policy({"Effect": "Allow", "Action": "s3:*", "Resource": "*"})
     host = "localhost"
     region = "us-east-1"
     port: int
     endpoint: str
     _enforcing_permissions = False
     _iam_endpoint: str
-    _p: multiprocessing.Process
+    _p: Optional[Union[multiprocessing.Process, threading.Thread]] = None
+    _server: Any = None
+    use_thread_server = False
+    """Run Moto in a daemon thread of this process rather than a separate process. Saves the process start-up cost,
+    but Moto's global state is then shared with the tests, so only enable it for tests that don't use Moto directly."""
     _s3_admin: Any
     _iam_admin: Any = None
     _bucket_id = 0
-    _live_buckets: List[S3Bucket] = []
+    _live_buckets: Dict[str, S3Bucket]
 
     def __init__(self, use_ssl: bool):
+        super().__init__()
         self.http_protocol = "https" if use_ssl else "http"
+        self._live_buckets = {}  # Keyed by bucket name, which is only unique within this factory
 
 
     @staticmethod
-    def run_server(port, key_file, cert_file):
-        import werkzeug
+    def _create_app():
         from moto.server import DomainDispatcherApplication, create_backend_app
 
         class _HostDispatcherApplication(DomainDispatcherApplication):
 
+            _HOST_MAP = {"localhost": "s3", "127.0.0.1": "iam", "moto_api": "moto_api"}
             _reqs_till_rate_limit = -1
+            _RATE_LIMIT_BODY = (b'<?xml version="1.0" encoding="UTF-8"?><Error><Code>SlowDown</Code><Message>Please reduce your request rate.</Message>'
+                                b'<RequestId>176C22715A856A29</RequestId><HostId>9Gjjt1m+cjU4OPvX9O9/8RuvnG41MRb/18Oux2o5H5MY7ISNTlXN+Dz9IG62/ILVxhAGI0qyPfg=</HostId></Error>')
+            _RATE_LIMIT_HEADERS = (("Content-Type", "text/xml"), ("Content-Length", str(len(_RATE_LIMIT_BODY))))
+            _RATE_LIMIT_RESP = (_RATE_LIMIT_BODY,)
 
             def get_backend_for_host(self, host):
                 """The stand-alone server needs a way to distinguish between S3 and IAM. We use the host for that"""
                 if host is None:
                     return None
-                if "s3" in host or host == "localhost":
+                backend = self._HOST_MAP.get(host)
+                if backend:
+                    return backend
+                if "s3" in host:
                     return "s3"
-                elif host == "127.0.0.1":
-                    return "iam"
-                elif host == "moto_api":
-                    return "moto_api"
-                else:
-                    raise RuntimeError(f"Unknown host {host}")
+                raise RuntimeError(f"Unknown host {host}")
+
+            def _imds(self, environ, start_response):
+                """Mock ec2 imds responses for testing"""
+                start_response("200 OK", [("Content-Type", "text/plain")])
+                return [b"Something to prove imds is reachable"]
+
+            def _set_rate_limit(self, environ, start_response):
+                """Allow setting up a rate limit"""
+                length = int(environ["CONTENT_LENGTH"])
+                body = environ["wsgi.input"].read(length).decode("ascii")
+                with self.lock:
+                    self._reqs_till_rate_limit = int(body)
+                start_response("200 OK", [("Content-Type", "text/plain")])
+                return [b"Limit accepted"]
+
+            _SPECIAL_PATHS = {
+                b"/latest/dynamic/instance-identity/document": _imds,
+                b"/rate_limit": _set_rate_limit,
+            }
 
             def __call__(self, environ, start_response):
-                path_info: bytes = environ.get("PATH_INFO", "")
+                path_info = environ.get("PATH_INFO", b"")
+                if isinstance(path_info, str):
+                    path_info = path_info.encode("latin-1")  # WSGI strings are always latin-1 decoded
+                handler = self._SPECIAL_PATHS.get(path_info)
+                if handler:
+                    return handler(self, environ, start_response)
 
                 with self.lock:
-                    # Mock ec2 imds responses for testing
-                    if path_info in ("/latest/dynamic/instance-identity/document", b"/latest/dynamic/instance-identity/document"):
-                        start_response("200 OK", [("Content-Type", "text/plain")])
-                        return [b"Something to prove imds is reachable"]
-
-                    # Allow setting up a rate limit
-                    if path_info in ("/rate_limit", b"/rate_limit"):
-                        length = int(environ["CONTENT_LENGTH"])
-                        body = environ["wsgi.input"].read(length).decode("ascii")
-                        self._reqs_till_rate_limit = int(body)
-                        start_response("200 OK", [("Content-Type", "text/plain")])
-                        return [b"Limit accepted"]
-
-                    if self._reqs_till_rate_limit == 0:
-                        response_body = (b'<?xml version="1.0" encoding="UTF-8"?><Error><Code>SlowDown</Code><Message>Please reduce your request rate.</Message>'
-                                         b'<RequestId>176C22715A856A29</RequestId><HostId>9Gjjt1m+cjU4OPvX9O9/8RuvnG41MRb/18Oux2o5H5MY7ISNTlXN+Dz9IG62/ILVxhAGI0qyPfg=</HostId></Error>')
-                        start_response(
-                            "503 Slow Down", [("Content-Type", "text/xml"), ("Content-Length", str(len(response_body)))]
-                        )
-                        return [response_body]
-                    else:
+                    rate_limited = self._reqs_till_rate_limit == 0
+                    if not rate_limited:
                         self._reqs_till_rate_limit -= 1
 
+                if rate_limited:
+                    start_response("503 Slow Down", list(self._RATE_LIMIT_HEADERS))
+                    return self._RATE_LIMIT_RESP
+
                 return super().__call__(environ, start_response)
+
+        return _HostDispatcherApplication(create_backend_app)
+
+    @staticmethod
+    def run_server(port, key_file, cert_file):
+        import werkzeug
+
         werkzeug.run_simple(
             "0.0.0.0",
             port,
-            _HostDispatcherApplication(create_backend_app),
+            MotoS3StorageFixtureFactory._create_app(),
             threaded=True,
             ssl_context=(cert_file, key_file) if cert_file and key_file else None,
         )
 
-    def _start_server(self):
-        port = self.port = get_ephemeral_port(2)
+    def _start_server(self, port: int, timeout: float):
+        self._p = None
+        self.port = port
         self.endpoint = f"{self.http_protocol}://{self.host}:{port}"
         self.working_dir = mkdtemp(suffix="MotoS3StorageFixtureFactory")
         self._iam_endpoint = f"{self.http_protocol}://localhost:{port}"
 
         self.ssl = self.http_protocol == "https" # In real world, using https protocol doesn't necessarily mean ssl will be verified
         if self.http_protocol == "https":
+            import trustme
+
             self.key_file = os.path.join(self.working_dir, "key.pem")
             self.cert_file = os.path.join(self.working_dir, "cert.pem")
             self.client_cert_file = os.path.join(self.working_dir, "client.pem")
@@ -303,31 +433,63 @@ class MotoS3StorageFixtureFactory(BaseS3StorageFixtureFactory):
             self.client_cert_file = ""
             self.client_cert_dir = ""
         
-        self._p = multiprocessing.Process(
-            target=self.run_server, 
-            args=(port, 
-                  self.key_file if self.http_protocol == "https" else None, 
-                  self.cert_file if self.http_protocol == "https" else None,
-            )
-        )
+        key_file = self.key_file if self.http_protocol == "https" else None
+        cert_file = self.cert_file if self.http_protocol == "https" else None
+        if self.use_thread_server:
+            from werkzeug.serving import make_server
+
+            ssl_context = (cert_file, key_file) if cert_file and key_file else None
+            self._server = make_server("0.0.0.0", port, self._create_app(), threaded=True, ssl_context=ssl_context)
+            self._p = threading.Thread(target=self._server.serve_forever, daemon=True)
+        else:
+            self._p = multiprocessing.Process(target=self.run_server, args=(port, key_file, cert_file))
         self._p.start()
-        wait_for_server_to_come_up(self.endpoint, "moto", self._p)
+        wait_for_server_to_come_up(self.endpoint, "moto", self._p, timeout=timeout, sleep=0.05)
+
+    def _stop_server(self):
+        if self._p is None:
+            return
+        if isinstance(self._p, threading.Thread):
+            if self._server is not None:
+                self._server.shutdown()
+                self._server.server_close()
+                self._server = None
+            self._p.join()
+        else:
+            GracefulProcessUtils.terminate(self._p)
 
     def _safe_enter(self):
-        for _ in range(3):  # For unknown reason, Moto, when running in pytest-xdist, will randomly fail to start
+        port = get_ephemeral_port(2)
+        attempts = 3  # For unknown reason, Moto, when running in pytest-xdist, will randomly fail to start
+        for attempt in range(attempts):
             try:
-                self._start_server()
+                self._start_server(port, timeout=10 * (attempt + 1))
                 break
-            except AssertionError as e:  # Thrown by wait_for_server_to_come_up
+            # AssertionError is thrown by wait_for_server_to_come_up, OSError if the in-thread server fails to bind
+            except (AssertionError, OSError) as e:
                 sys.stderr.write(repr(e))
-                GracefulProcessUtils.terminate(self._p)
+                error = e
+                died = self._p is None or not self._p.is_alive()
+                self._stop_server()
+                if attempt + 1 < attempts:
+                    if died:  # Possibly lost the port to another process, so look for a free one again
+                        port = get_ephemeral_port(2)
+                    time.sleep(0.1 * 2**attempt)
+        else:
+            raise RuntimeError(f"Moto failed to start after {attempts} attempts") from error
 
         self._s3_admin = self._boto(service="s3", key=self.default_key)
         return self
 
     def __exit__(self, exc_type, exc_value, traceback):
-        GracefulProcessUtils.terminate(self._p)
-        safer_rmtree(self, self.working_dir)
+        if self._http_session is not None:
+            self._http_session.close()
+            self._http_session = None
+        self._stop_server()
+        try:
+            os.rmdir(self.working_dir)  # Only succeeds if empty, which is the case unless we generated SSL certs
+        except OSError:
+            safer_rmtree(self, self.working_dir)
 
     def _create_user_get_key(self, user: str, iam=None):
         iam = iam or self._iam_admin
@@ -346,18 +508,7 @@ class MotoS3StorageFixtureFactory(BaseS3StorageFixtureFactory):
             return
         if enforcing and not self._iam_admin:
             iam = self._boto(service="iam", key=self.default_key)
-
-            def _policy(*statements):
-                return json.dumps({"Version": "2012-10-17", "Statement": statements})
-
-            policy = _policy(
-                {"Effect": "Allow", "Action": "s3:*", "Resource": "*"},
-                {"Effect": "Allow", "Action": "iam:*", "Resource": "*"},
-            )
-            policy_arn = iam.create_policy(PolicyName="admin", PolicyDocument=policy)["Policy"]["Arn"]
-
-            self._RO_POLICY = _policy({"Effect": "Allow", "Action": ["s3:List*", "s3:Get*"], "Resource": "*"})
-            self._RW_POLICY = _policy({"Effect": "Allow", "Action": "s3:*", "Resource": "*"})
+            policy_arn = iam.create_policy(PolicyName="admin", PolicyDocument=self._ADMIN_POLICY)["Policy"]["Arn"]
 
             key = self._create_user_get_key("admin", iam)
             iam.attach_user_policy(UserName="admin", PolicyArn=policy_arn)
@@ -365,7 +516,7 @@ class MotoS3StorageFixtureFactory(BaseS3StorageFixtureFactory):
             self._s3_admin = self._boto(service="s3", key=key)
 
         # The number is the remaining requests before permission checks kick in
-        requests.post(self._iam_endpoint + "/moto-api/reset-auth", "0" if enforcing else "inf")
+        self._http().post(self._iam_endpoint + "/moto-api/reset-auth", "0" if enforcing else "inf")
         self._enforcing_permissions = enforcing
 
     def create_fixture(self) -> S3Bucket:
@@ -374,16 +525,20 @@ class MotoS3StorageFixtureFactory(BaseS3StorageFixtureFactory):
         self._bucket_id += 1
 
         out = S3Bucket(self, bucket)
-        self._live_buckets.append(out)
+        self._live_buckets[bucket] = out
         return out
 
     def cleanup_bucket(self, b: S3Bucket):
-        self._live_buckets.remove(b)
-        if len(self._live_buckets):
-            b.slow_cleanup(failure_consequence="The following delete bucket call will also fail. ")
+        self._live_buckets.pop(b.bucket)
+        if self._live_buckets:
+            consequence = "The following delete bucket call will also fail. "
+            if self.use_fast_cleanup:
+                b.fast_cleanup(client=self._s3_admin, failure_consequence=consequence)
+            else:
+                b.slow_cleanup(failure_consequence=consequence)
             self._s3_admin.delete_bucket(Bucket=b.bucket)
         else:
-            requests.post(self._iam_endpoint + "/moto-api/reset", verify=False) # If CA cert verify fails, it will take ages for this line to finish
+            self._http().post(self._iam_endpoint + "/moto-api/reset")
             self._iam_admin = None
 
 
@@ -12,7 +12,6 @@ import subprocess
 import os
 import platform
 import sys
-import requests
 import signal
 import socketserver
 import time
@@ -20,7 +19,6 @@ import warnings
 from typing import Union, Any
 from contextlib import AbstractContextManager
 from dataclasses import dataclass, field
-import trustme
 
 _WINDOWS = platform.system() == "Windows"
 _DEBUG = os.getenv("ACTIONS_RUNNER_DEBUG", default=None) in (1, "True")
@@ -91,6 +89,8 @@ class GracefulProcessUtils:
 
 
 def wait_for_server_to_come_up(url: str, service: str, process: ProcessUnion, *, timeout=20, sleep=0.2, req_timeout=1):
+    import requests
+
     deadline = time.time() + timeout
     alive = (lambda: process.poll() is None) if isinstance(process, subprocess.Popen) else process.is_alive
     while True:
@@ -1,5 +1,8 @@
+import threading
+
 import requests
-from arcticdb.storage_fixtures.s3 import MotoS3StorageFixtureFactory
+from arcticdb.storage_fixtures.api import ArcticUriFields
+from arcticdb.storage_fixtures.s3 import MotoS3StorageFixtureFactory, S3Bucket
 
 
 def test_rate_limit(s3_storage_factory: MotoS3StorageFixtureFactory):  # Don't need to create buckets
@@ -27,3 +30,45 @@ def test_rate_limit(s3_storage_factory: MotoS3StorageFixtureFactory):  # Don't n
 
     # Then working again
     requests.head(s3.endpoint, verify=s3.client_cert_file).raise_for_status()
+
+
+def test_replace_uri_field():
+    uri = "s3://localhost:bucket?access=awd&secret=pwd&port=1234"
+    assert S3Bucket.replace_uri_field(uri, ArcticUriFields.HOST, "h") == "s3://h:bucket?access=awd&secret=pwd&port=1234"
+    assert S3Bucket.replace_uri_field(uri, ArcticUriFields.BUCKET, "b") == (
+        "s3://localhost:b?access=awd&secret=pwd&port=1234"
+    )
+    assert S3Bucket.replace_uri_field(uri, ArcticUriFields.USER, "aws_auth=true", start=1) == (
+        "s3://localhost:bucket?aws_auth=true&secret=pwd&port=1234"
+    )
+    assert S3Bucket.replace_uri_field(uri, ArcticUriFields.PASSWORD, "", start=1, end=3) == (
+        "s3://localhost:bucket?access=awd&port=1234"
+    )
+
+
+def test_fast_cleanup(s3_storage):
+    ac = s3_storage.create_arctic()
+    ac.create_library("lib_a").write_pickle("sym", 1)
+    ac.create_library("lib_b").write_pickle("sym", 2)
+
+    s3_storage.fast_cleanup(prefix="lib_a")
+    keys = list(s3_storage.iter_underlying_object_names())
+    assert keys
+    assert not any(k.startswith("lib_a/") for k in keys)
+    assert s3_storage.libs_names_from_arctic == ["lib_b"]
+
+    s3_storage.fast_cleanup()
+    assert not list(s3_storage.iter_underlying_object_names())
+    assert not s3_storage.libs_names_from_arctic
+
+
+def test_thread_server():
+    factory = MotoS3StorageFixtureFactory(use_ssl=False)
+    factory.use_thread_server = True
+    with factory:
+        assert isinstance(factory._p, threading.Thread)
+        with factory.create_fixture() as s3_storage:
+            lib = s3_storage.create_arctic().create_library("test_thread_server")
+            lib.write_pickle("sym", 1)
+            assert lib.read("sym").data == 1
+    assert not factory._p.is_alive()